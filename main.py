@@ -56,6 +56,13 @@ Examples:
         help="Include PDF files using Docling for text extraction (requires 'pdf' extra)",
     )
 
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Cache extracted PDF text in this directory to skip re-extraction on later runs",
+    )
+
     parser.add_argument(
         "--no-tree",
         action="store_true",
@@ -99,14 +106,29 @@ Examples:
     parser.add_argument(
         "--split",
         action="store_true",
-        help="Split output into multiple files based on character limit",
+        help="Split output into multiple files based on a size limit",
     )
 
     parser.add_argument(
+        "--max-bytes",
         "--max-chars",
+        dest="max_bytes",
         type=int,
         default=100_000,
-        help="Maximum characters per output file when using --split (default: 100000)",
+        help="Maximum UTF-8 bytes per output file when using --split (default: 100000); "
+        "--max-chars is a deprecated alias",
+    )
+
+    parser.add_argument(
+        "--bare",
+        action="store_true",
+        help="Read remote repositories from a bare clone without checking out files",
+    )
+
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Replace files identical to an earlier file with a reference to it",
     )
 
     parser.add_argument(
@@ -191,7 +213,10 @@ def main(args: list[str] | None = None) -> int:
         custom_extensions=custom_extensions,
         exclude_dirs=exclude_dirs,
         split_output=parsed_args.split,
-        max_chars_per_file=parsed_args.max_chars,
+        max_bytes_per_file=parsed_args.max_bytes,
+        bare_clone=parsed_args.bare,
+        cache_dir=parsed_args.cache_dir,
+        dedupe=parsed_args.dedupe,
     )
 
     # Check PDF support if requested
@@ -228,14 +253,14 @@ def main(args: list[str] | None = None) -> int:
             handler = GitHandler(parsed_args.repository)
             output_path = Path.cwd() / f"{handler.repo_name}.md"
 
-        # Convert
-        markdown = converter.convert(parsed_args.repository, output_path)
-
         if parsed_args.stdout:
+            markdown = converter.convert(parsed_args.repository)
             # Handle encoding for stdout (especially on Windows)
             sys.stdout.reconfigure(encoding="utf-8", errors="replace")
             print(markdown)
         else:
+            # Stream the output straight to disk
+            converter.convert_to_file(parsed_args.repository, output_path)
             generated_files = converter.get_generated_files()
             if parsed_args.verbose:
                 if len(generated_files) > 1:
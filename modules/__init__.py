@@ -6,22 +6,26 @@ This package provides modular components for:
 - Discovering and filtering files
 - Reading text-based files
 - Optional PDF extraction using Docling
+- Caching extracted content between runs
 - Generating formatted Markdown output
 """
 
+from modules.content_cache import ContentCache
 from modules.converter import ConverterConfig, GitToMarkdownConverter
 from modules.file_discovery import FileDiscovery
-from modules.git_handler import GitHandler
+from modules.git_handler import BareGitHandler, GitHandler
 from modules.markdown_generator import FileContent, MarkdownGenerator
 from modules.pdf_reader import PDFReader, PDFReaderError
 from modules.text_reader import TextReader
 
 __all__ = [
     "GitHandler",
+    "BareGitHandler",
     "FileDiscovery",
     "TextReader",
     "PDFReader",
     "PDFReaderError",
+    "ContentCache",
     "MarkdownGenerator",
     "FileContent",
     "GitToMarkdownConverter",
@@ -0,0 +1,149 @@
+"""
+Extracted content cache module.
+
+Provides an on-disk cache for content that is expensive to extract (such as
+PDF text), so re-running the converter on an unchanged repository can skip
+the extraction.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+
+class ContentCache:
+    """
+    Caches extracted content on disk, keyed by a hash of the source file.
+
+    A manifest remembers the (mtime, size, digest) last seen for each source
+    file, so unchanged files are recognized without being hashed again.
+    Files with new metadata are hashed, which still hits the cache when only
+    the metadata changed (e.g. in a fresh clone). Manifest entries are keyed
+    by the caller's name for the file, such as its path within the
+    repository, so they carry over between clones of the same repository.
+
+    The manifest is only written by save(), which keeps just the entries
+    used since the cache was opened.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the manifest and cached content.
+        """
+        self.cache_dir = cache_dir
+        self._manifest_path = cache_dir / self.MANIFEST_NAME
+        self._manifest: dict[str, list] = self._load_manifest()
+        # Entries used in this run, which become the next manifest
+        self._seen: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def _load_manifest(self) -> dict[str, list]:
+        """Load the manifest, starting fresh if it is missing or corrupt."""
+        try:
+            return json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def save(self) -> None:
+        """Write the manifest atomically, dropping entries unused in this run."""
+        with self._lock:
+            if self._seen == self._manifest:
+                return
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Per-process temporary file, as concurrent runs may share the cache
+            temp_path = self._manifest_path.with_suffix(f".{os.getpid()}.tmp")
+            temp_path.write_text(json.dumps(self._seen), encoding="utf-8")
+            os.replace(temp_path, self._manifest_path)
+            self._manifest = dict(self._seen)
+
+    def _digest(self, file_path: Path, key: str | None) -> str:
+        """Get the content digest of a file, reusing the manifest when possible."""
+        stat = file_path.stat()
+        key = str(file_path) if key is None else key
+        with self._lock:
+            entry = self._seen.get(key) or self._manifest.get(key)
+        if not (entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size):
+            with open(file_path, "rb") as f:
+                digest = hashlib.file_digest(
+                    f, lambda: hashlib.blake2b(digest_size=16)
+                ).hexdigest()
+            entry = [stat.st_mtime_ns, stat.st_size, digest]
+
+        with self._lock:
+            self._seen[key] = entry
+        return entry[2]
+
+    def _content_path(self, file_path: Path, key: str | None) -> Path | None:
+        """Get where a file's content is cached, or None if it can't be hashed."""
+        try:
+            return self.cache_dir / f"{self._digest(file_path, key)}.md"
+        except OSError:
+            return None
+
+    def get(self, file_path: Path, key: str | None = None) -> str | None:
+        """
+        Get the cached content for a file.
+
+        Args:
+            file_path: Path to the source file.
+            key: Name of the file in the manifest (defaults to file_path).
+
+        Returns:
+            The cached content, or None on a miss.
+        """
+        cached_path = self._content_path(file_path, key)
+        if cached_path is None:
+            return None
+        try:
+            return cached_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def put(self, file_path: Path, content: str, key: str | None = None) -> None:
+        """
+        Store the content extracted from a file.
+
+        Args:
+            file_path: Path to the source file.
+            content: Content to cache.
+            key: Name of the file in the manifest (defaults to file_path).
+        """
+        cached_path = self._content_path(file_path, key)
+        if cached_path is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cached_path.write_text(content, encoding="utf-8")
+
+    def get_or_compute(
+        self,
+        file_path: Path,
+        compute: Callable[[Path], str | None],
+        key: str | None = None,
+    ) -> str | None:
+        """
+        Get the cached content for a file, computing and storing it on a miss.
+
+        Args:
+            file_path: Path to the source file.
+            compute: Function extracting the content from the file. None
+                results are returned but not cached.
+            key: Name of the file in the manifest (defaults to file_path).
+
+        Returns:
+            The cached or freshly computed content.
+        """
+        content = self.get(file_path, key)
+        if content is not None:
+            return content
+
+        content = compute(file_path)
+        if content is not None:
+            self.put(file_path, content, key)
+        return content
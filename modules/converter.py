@@ -5,20 +5,36 @@ This module ties together all the other modules to provide a simple API
 for converting repositories to Markdown.
 """
 
+import contextlib
+import os
+import queue
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from git import Blob
+
 from modules.file_discovery import FileDiscovery
-from modules.git_handler import GitHandler
+from modules.git_handler import BareGitHandler, GitHandler
 from modules.markdown_generator import FileContent, MarkdownGenerator
 from modules.pdf_reader import PDFReader
-from modules.text_reader import TextReader
+from modules.text_reader import Placeholder, TextReader
+
+# Upper bound on concurrent file reads
+MAX_READ_WORKERS = 32
+
+# Blobs read ahead of the consumer in bare clone mode
+BLOB_QUEUE_SIZE = 64
 
 
 class ConverterConfig:
     """Configuration for the Git to Markdown converter."""
 
-    # Default max characters per output file (100k)
-    DEFAULT_MAX_CHARS_PER_FILE = 100_000
+    # Default max UTF-8 bytes per output file (100k)
+    DEFAULT_MAX_BYTES_PER_FILE = 100_000
+    # Deprecated name of DEFAULT_MAX_BYTES_PER_FILE
+    DEFAULT_MAX_CHARS_PER_FILE = DEFAULT_MAX_BYTES_PER_FILE
 
     def __init__(
         self,
@@ -30,7 +46,11 @@ class ConverterConfig:
         custom_extensions: set[str] | None = None,
         exclude_dirs: set[str] | None = None,
         split_output: bool = False,
-        max_chars_per_file: int = DEFAULT_MAX_CHARS_PER_FILE,
+        max_bytes_per_file: int = DEFAULT_MAX_BYTES_PER_FILE,
+        bare_clone: bool = False,
+        cache_dir: Path | None = None,
+        dedupe: bool = False,
+        max_chars_per_file: int | None = None,
     ):
         """
         Initialize converter configuration.
@@ -44,7 +64,13 @@ class ConverterConfig:
             custom_extensions: Additional file extensions to include.
             exclude_dirs: Additional directories to exclude.
             split_output: Whether to split output into multiple files.
-            max_chars_per_file: Maximum characters per output file when splitting.
+            max_bytes_per_file: Maximum UTF-8 bytes per output file when splitting.
+            bare_clone: Whether to read remote repositories from a bare clone
+                instead of checking out a working tree.
+            cache_dir: Optional directory to cache extracted PDF text in.
+            dedupe: Whether to replace files identical to an earlier file
+                with a reference to it.
+            max_chars_per_file: Deprecated alias for max_bytes_per_file.
         """
         self.include_pdf = include_pdf
         self.include_tree = include_tree
@@ -54,7 +80,31 @@ class ConverterConfig:
         self.custom_extensions = custom_extensions
         self.exclude_dirs = exclude_dirs
         self.split_output = split_output
-        self.max_chars_per_file = max_chars_per_file
+        if max_chars_per_file is not None:
+            warnings.warn(
+                "max_chars_per_file is deprecated, use max_bytes_per_file instead",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            max_bytes_per_file = max_chars_per_file
+        self.max_bytes_per_file = max_bytes_per_file
+        self.bare_clone = bare_clone
+        self.cache_dir = cache_dir
+        self.dedupe = dedupe
+
+    @property
+    def max_chars_per_file(self) -> int:
+        """Deprecated alias for max_bytes_per_file."""
+        return self.max_bytes_per_file
+
+    @max_chars_per_file.setter
+    def max_chars_per_file(self, value: int) -> None:
+        warnings.warn(
+            "max_chars_per_file is deprecated, use max_bytes_per_file instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        self.max_bytes_per_file = value
 
 
 class GitToMarkdownConverter:
@@ -73,7 +123,7 @@ class GitToMarkdownConverter:
 
         # Initialize PDF reader if needed
         if self.config.include_pdf:
-            self._pdf_reader = PDFReader()
+            self._pdf_reader = PDFReader(cache_dir=self.config.cache_dir)
 
     def convert(self, repo_source: str, output_path: Path | str | None = None) -> str:
         """
@@ -86,8 +136,30 @@ class GitToMarkdownConverter:
         Returns:
             The generated Markdown content.
         """
+        generator = self._build_generator(repo_source)
+
+        # Generate output, keeping the renderings when they are about to be
+        # split into chunks as well
+        markdown = generator.generate(
+            cache=bool(output_path) and self.config.split_output
+        )
+
+        # Write to file if path provided
+        if output_path:
+            self._write_output(generator, Path(output_path), markdown)
+
+        return markdown
+
+    def _build_generator(self, repo_source: str) -> MarkdownGenerator:
+        """Load the repository and collect its files into a MarkdownGenerator."""
+        handler = (
+            BareGitHandler(repo_source)
+            if self.config.bare_clone
+            else GitHandler(repo_source, sparse=True)
+        )
+
         # Use context manager for automatic cleanup of cloned repos
-        with GitHandler(repo_source) as git_handler:
+        with handler as git_handler:
             repo_path = git_handler.repo_path
             repo_name = git_handler.repo_name
 
@@ -97,63 +169,253 @@ class GitToMarkdownConverter:
                 include_pdf=self.config.include_pdf,
                 custom_extensions=self.config.custom_extensions,
                 exclude_dirs=self.config.exclude_dirs,
+                max_file_size=self.config.max_file_size,
             )
 
-            # Generate tree
-            tree = discovery.generate_tree(max_depth=self.config.max_tree_depth)
-
-            # Get files
-            files = discovery.discover_files()
-
             # Initialize markdown generator
             generator = MarkdownGenerator(
                 repo_name=repo_name,
                 include_tree=self.config.include_tree,
                 include_toc=self.config.include_toc,
                 max_tree_depth=self.config.max_tree_depth,
+                dedupe=self.config.dedupe,
             )
+
+            if isinstance(git_handler, BareGitHandler) and git_handler.is_bare:
+                tree = self._add_blob_files(git_handler, discovery, generator)
+            else:
+                tree = self._add_working_tree_files(git_handler, discovery, generator)
             generator.set_tree(tree)
 
-            # Process files
-            for file_path in files:
-                relative_path = str(file_path.relative_to(repo_path))
-                is_pdf = file_path.suffix.lower() == ".pdf"
+        if self._pdf_reader:
+            self._pdf_reader.save_cache()
 
-                if is_pdf and self._pdf_reader:
-                    # Handle PDF file
-                    content = self._pdf_reader.read_pdf_safe(file_path)
-                    language = "markdown"  # PDF content is exported as markdown
-                else:
-                    # Handle text file
-                    content = self._text_reader.read_file(file_path)
-                    if content is None:
-                        content = "[Failed to read file]"
-                    language = self._text_reader.get_language_identifier(file_path)
-
-                file_content = FileContent(
-                    path=file_path,
-                    relative_path=relative_path,
-                    content=content,
-                    language=language,
-                    is_pdf=is_pdf,
+        return generator
+
+    def _write_output(
+        self,
+        generator: MarkdownGenerator,
+        output_path: Path,
+        content: str | None = None,
+    ) -> None:
+        """Write the output file(s), streaming unless content is already rendered."""
+        if self.config.split_output:
+            self._generated_files = generator.generate_chunked_to_files(
+                output_path, self.config.max_bytes_per_file
+            )
+        else:
+            generator.generate_to_file(output_path, content)
+            self._generated_files = [output_path]
+
+    def _add_working_tree_files(
+        self,
+        git_handler: GitHandler,
+        discovery: FileDiscovery,
+        generator: MarkdownGenerator,
+    ) -> str:
+        """Read files from the checked-out repository and return the tree."""
+        # Discovered paths live under the resolved root, which differs from
+        # repo_path when the clone directory is behind a symlink
+        repo_path = discovery.root_path
+
+        # Only check out files that can end up in the output
+        # (no-op for local repositories)
+        git_handler.sparse_checkout(discovery.sparse_checkout_patterns())
+
+        # For clones, HEAD is exactly the working tree, so one `git ls-tree`
+        # replaces the directory walk. Local repositories are still walked
+        # to pick up uncommitted and untracked files.
+        tracked_files = git_handler.list_tracked_files() if git_handler.is_cloned else None
+        if tracked_files is not None:
+            files, tree = discovery.select_paths(
+                tracked_files,
+                max_depth=self.config.max_tree_depth,
+                stat_files=True,
+            )
+        else:
+            # Discover files and generate tree in a single pass
+            files, tree = discovery.walk_once(max_depth=self.config.max_tree_depth)
+
+        # PDFs are submitted to Docling worker processes first, so they
+        # convert while text files are being read
+        is_pdf = [
+            self._pdf_reader is not None and f.lower().endswith(".pdf") for f in files
+        ]
+        pdf_files = [f for f, pdf in zip(files, is_pdf, strict=True) if pdf]
+        prefix_len = len(os.path.join(repo_path, ""))
+        pdf_contents = (
+            self._pdf_reader.read_many(
+                [Path(f) for f in pdf_files], [f[prefix_len:] for f in pdf_files]
+            )
+            if self._pdf_reader
+            else iter(())
+        )
+
+        # Read text files concurrently; results are consumed in submission
+        # order so the output stays deterministic
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(MAX_READ_WORKERS, len(files)))
+        ) as text_pool:
+            futures = [
+                None
+                if pdf
+                else text_pool.submit(
+                    self._read_file,
+                    f,
+                    repo_path,
+                    stat=discovery.get_stat(f),
+                    suffix=discovery.get_suffix(f),
                 )
+                for f, pdf in zip(files, is_pdf, strict=True)
+            ]
+
+            for file_path, future in zip(files, futures, strict=True):
+                if future is None:
+                    file_content = self._read_file(
+                        file_path, repo_path, content=next(pdf_contents)
+                    )
+                else:
+                    file_content = future.result()
                 generator.add_file(file_content)
 
-            # Generate output
-            markdown = generator.generate()
+        return tree
 
-            # Write to file if path provided
-            if output_path:
-                output_path = Path(output_path)
-                if self.config.split_output:
-                    self._generated_files = generator.generate_chunked_to_files(
-                        output_path, self.config.max_chars_per_file
-                    )
+    def _add_blob_files(
+        self,
+        git_handler: BareGitHandler,
+        discovery: FileDiscovery,
+        generator: MarkdownGenerator,
+    ) -> str:
+        """Read files from a bare clone's object database and return the tree."""
+        max_size = self.config.max_file_size
+        blobs = {
+            path: blob
+            for path, blob in git_handler.iter_blobs()
+            if max_size is None or blob.size <= max_size
+        }
+        files, tree = discovery.select_paths(
+            blobs, max_depth=self.config.max_tree_depth
+        )
+
+        # A producer thread reads the blobs while this thread runs Docling,
+        # so PDF extraction overlaps with object database reads
+        items: queue.Queue = queue.Queue(maxsize=BLOB_QUEUE_SIZE)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._produce_blob_files,
+            args=(git_handler, discovery, files, blobs, items, stop),
+            daemon=True,
+        )
+        producer.start()
+
+        try:
+            while (item := items.get()) is not None:
+                if isinstance(item, BaseException):
+                    raise item
+                file_path, result = item
+                if isinstance(result, Path):
+                    result = self._read_file(file_path, discovery.root_path, result)
+                generator.add_file(result)
+        finally:
+            # Unblock the producer if we bailed out early
+            stop.set()
+            while producer.is_alive():
+                with contextlib.suppress(queue.Empty):
+                    items.get(timeout=0.1)
+
+        return tree
+
+    def _produce_blob_files(
+        self,
+        git_handler: BareGitHandler,
+        discovery: FileDiscovery,
+        files: list[str],
+        blobs: dict[str, Blob],
+        items: queue.Queue,
+        stop: threading.Event,
+    ) -> None:
+        """
+        Read blobs in order and queue them for _add_blob_files.
+
+        Blobs are read sequentially from this single thread: GitPython's
+        object database talks to one `git cat-file` process that is not
+        thread-safe. Text files are queued as FileContent, PDFs as the path
+        they were exported to. The queue ends with None, or with the
+        exception that stopped the producer.
+        """
+        repo_path = discovery.root_path
+        prefix_len = len(os.path.join(repo_path, ""))
+        try:
+            for file_path in files:
+                if stop.is_set():
+                    return
+                blob = blobs[file_path[prefix_len:].replace(os.sep, "/")]
+                if file_path.lower().endswith(".pdf") and self._pdf_reader:
+                    # Docling needs a real file to work with
+                    result: FileContent | Path = git_handler.export_blob(blob)
                 else:
-                    generator.generate_to_file(output_path)
-                    self._generated_files = [output_path]
+                    suffix = discovery.get_suffix(file_path)
+                    result = self._read_file(file_path, repo_path, blob, suffix=suffix)
+                items.put((file_path, result))
+            items.put(None)
+        except Exception as e:
+            items.put(e)
 
-            return markdown
+    def _read_file(
+        self,
+        file_path: str,
+        repo_path: Path,
+        source: str | Path | Blob | None = None,
+        *,
+        content: str | None = None,
+        stat: os.stat_result | None = None,
+        suffix: str | None = None,
+    ) -> FileContent:
+        """
+        Read a single file and wrap it with its metadata.
+
+        Args:
+            file_path: Absolute path of the file within the repository.
+            repo_path: Root path of the repository.
+            source: Where to read the content from, if not file_path itself.
+            content: PDF content that was already extracted, skipping the read.
+            stat: Stat result of the file from discovery, if known.
+            suffix: Lowercased extension discovery matched the file on, if known.
+
+        Returns:
+            The file's content and metadata.
+        """
+        relative_path = file_path[len(os.path.join(repo_path, "")) :]
+        is_pdf = file_path.lower().endswith(".pdf")
+        if source is None:
+            source = Path(file_path) if is_pdf else file_path
+
+        if is_pdf and self._pdf_reader and isinstance(source, Path):
+            # Handle PDF file
+            if content is None:
+                content = self._pdf_reader.read_pdf_safe(source, relative_path)
+            language = "markdown"  # PDF content is exported as markdown
+        else:
+            # Handle text file
+            content = self._text_reader.read_file(source, stat=stat)
+            if content is None:
+                content = Placeholder("[Failed to read file]")
+            if suffix is None:
+                language = self._text_reader.get_language_identifier(file_path)
+            else:
+                # Discovery already split the name, so skip doing it again
+                language = self._text_reader.get_language_identifier_fast(
+                    relative_path.rpartition(os.sep)[2], suffix
+                )
+
+        return FileContent(
+            path=Path(file_path),
+            relative_path=relative_path,
+            content=content,
+            language=language,
+            is_pdf=is_pdf,
+            is_placeholder=isinstance(content, Placeholder),
+        )
 
     def get_generated_files(self) -> list[Path]:
         """Get the list of generated files from the last conversion."""
@@ -171,7 +433,13 @@ class GitToMarkdownConverter:
             Path to the generated file, or list of paths if split_output is enabled.
         """
         output_path = Path(output_path)
-        self.convert(repo_source, output_path)
+        generator = self._build_generator(repo_source)
+
+        # Stream straight to disk; the full document is never built in memory
+        self._write_output(generator, output_path)
+
+        if self.config.split_output:
+            return self.get_generated_files()
         return output_path
 
     def check_pdf_support(self) -> bool:
@@ -5,7 +5,12 @@ Provides functionality to discover files in a repository and filter them
 based on extensions, patterns, and other criteria.
 """
 
-from collections.abc import Iterator
+import fnmatch
+import functools
+import os
+import re
+from collections.abc import Iterable
+from operator import itemgetter
 from pathlib import Path
 
 
@@ -171,6 +176,65 @@ DEFAULT_EXCLUDE_DIRS: set[str] = {
 }
 
 
+def _case_insensitive_glob(text: str) -> str:
+    """Turn text into a glob that matches it regardless of letter case."""
+    return "".join(
+        f"[{c.lower()}{c.upper()}]" if c.lower() != c.upper() else c for c in text
+    )
+
+
+def _freeze(values: set[str] | None, default: set[str]) -> frozenset[str]:
+    """
+    Turn an optional set into a hashable cache key (empty means unset).
+
+    Defaults are copied into the key rather than read inside the cached
+    function, so changes to the module-level default sets still apply.
+    """
+    return frozenset(values or default)
+
+
+@functools.lru_cache(maxsize=32)
+def _resolved_sets(
+    text_extensions: frozenset[str],
+    include_filenames: frozenset[str],
+    exclude_dirs: frozenset[str],
+    custom_extensions: frozenset[str],
+    include_pdf: bool,
+) -> tuple[frozenset[str], frozenset[str], frozenset[str], re.Pattern[str] | None]:
+    """
+    Resolve the inclusion and exclusion rules for a discovery configuration.
+
+    Returns:
+        Tuple of (extensions, filenames, excluded directory names, compiled
+        regex for wildcard exclusions or None).
+    """
+    extensions = set(text_extensions)
+
+    # Add custom extensions if provided
+    if custom_extensions:
+        extensions.update(custom_extensions)
+
+    # Add PDF extension if enabled
+    if include_pdf:
+        extensions.add(".pdf")
+
+    # Wildcard patterns are compiled into a single regex, so each directory
+    # is checked in one step
+    wildcards = sorted(p for p in exclude_dirs if "*" in p)
+    wildcard_re = (
+        re.compile("|".join(fnmatch.translate(p) for p in wildcards))
+        if wildcards
+        else None
+    )
+
+    return (
+        frozenset(extensions),
+        include_filenames,
+        exclude_dirs,
+        wildcard_re,
+    )
+
+
 class FileDiscovery:
     """Discovers and filters files in a repository."""
 
@@ -182,6 +246,7 @@ class FileDiscovery:
         exclude_dirs: set[str] | None = None,
         include_pdf: bool = False,
         custom_extensions: set[str] | None = None,
+        max_file_size: int | None = None,
     ):
         """
         Initialize the file discovery.
@@ -193,20 +258,30 @@ class FileDiscovery:
             exclude_dirs: Set of directory names to exclude.
             include_pdf: Whether to include PDF files.
             custom_extensions: Additional extensions to include.
+            max_file_size: Maximum file size in bytes to include (None for no limit).
         """
         self.root_path = root_path.resolve()
-        self.text_extensions = text_extensions or DEFAULT_TEXT_EXTENSIONS.copy()
-        self.include_filenames = include_filenames or DEFAULT_INCLUDE_FILENAMES.copy()
-        self.exclude_dirs = exclude_dirs or DEFAULT_EXCLUDE_DIRS.copy()
         self.include_pdf = include_pdf
-
-        # Add custom extensions if provided
-        if custom_extensions:
-            self.text_extensions.update(custom_extensions)
-
-        # Add PDF extension if enabled
-        if include_pdf:
-            self.text_extensions.add(".pdf")
+        self.max_file_size = max_file_size
+        # Stat results gathered by size checks, keyed by absolute path
+        self._stats: dict[str, os.stat_result] = {}
+        # Lowercased extensions of included files, keyed by absolute path
+        self._suffixes: dict[str, str] = {}
+
+        # Resolved rules are immutable and shared between instances with the
+        # same configuration
+        (
+            self.text_extensions,
+            self.include_filenames,
+            self.exclude_dirs,
+            self._wildcard_re,
+        ) = _resolved_sets(
+            _freeze(text_extensions, DEFAULT_TEXT_EXTENSIONS),
+            _freeze(include_filenames, DEFAULT_INCLUDE_FILENAMES),
+            _freeze(exclude_dirs, DEFAULT_EXCLUDE_DIRS),
+            _freeze(custom_extensions, set()),
+            include_pdf,
+        )
 
     def _should_exclude_dir(self, dir_name: str) -> bool:
         """Check if a directory should be excluded."""
@@ -214,87 +289,112 @@ class FileDiscovery:
         if dir_name in self.exclude_dirs:
             return True
         # Pattern matching for entries with wildcards
-        for pattern in self.exclude_dirs:
-            if "*" in pattern:
-                # Simple glob-like matching
-                if pattern.startswith("*") and dir_name.endswith(pattern[1:]):
-                    return True
-                if pattern.endswith("*") and dir_name.startswith(pattern[:-1]):
-                    return True
-        return False
-
-    def _is_text_file(self, file_path: Path) -> bool:
-        """Check if a file should be included based on extension or name."""
-        # Check exact filename match
-        if file_path.name in self.include_filenames:
-            return True
+        return self._wildcard_re is not None and self._wildcard_re.match(dir_name) is not None
 
-        # Check extension
-        suffix = file_path.suffix.lower()
-        if suffix in self.text_extensions:
-            return True
+    def _classify_names(self, names: list[str]) -> list[str | None]:
+        """
+        Check a batch of file names for inclusion in a single comprehension.
 
-        # Check for files without extension but with known names
-        return not suffix and file_path.name in self.include_filenames
+        A name is included when it matches a known filename exactly, or when
+        its extension is known. Extensions follow PurePath.suffix rules: a
+        leading or trailing dot does not start one.
 
-    def _is_pdf_file(self, file_path: Path) -> bool:
-        """Check if a file is a PDF."""
-        return file_path.suffix.lower() == ".pdf"
+        Args:
+            names: File names to check.
 
-    def discover_files(self) -> list[Path]:
+        Returns:
+            One entry per name, in the same order: the lowercased extension
+            ("" if there is none) for included names, None for the others.
         """
-        Discover all relevant files in the repository.
+        # Bind lookups locally so the loop does no attribute access
+        filenames = self.include_filenames
+        extensions = self.text_extensions
+        return [
+            suffix
+            if (
+                suffix := name[dot:].lower()
+                if 0 < (dot := name.rfind(".")) < len(name) - 1
+                else ""
+            )
+            in extensions
+            or name in filenames
+            else None
+            for name in names
+        ]
+
+    def _within_size_limit(self, entry: os.DirEntry[str] | str) -> bool:
+        """Check a file against max_file_size without opening it."""
+        if self.max_file_size is None:
+            return True
+        try:
+            # DirEntry serves this from the directory listing on Windows;
+            # one stat() elsewhere
+            if isinstance(entry, os.DirEntry):
+                stat, path = entry.stat(), entry.path
+            else:
+                stat, path = os.stat(entry), entry
+        except OSError:
+            return False
+        self._stats[path] = stat
+        return stat.st_size <= self.max_file_size
+
+    def get_stat(self, file_path: str) -> os.stat_result | None:
+        """
+        Get the stat result seen for a file during discovery.
+
+        Args:
+            file_path: Absolute path as returned by walk_once() or select_paths().
 
         Returns:
-            List of file paths sorted with README first if present.
+            The stat result, or None if the file was not stat'ed (no size limit).
+        """
+        return self._stats.get(file_path)
+
+    def get_suffix(self, file_path: str) -> str | None:
         """
-        files: list[Path] = []
-        readme_file: Path | None = None
+        Get the lowercased extension discovery matched a file on.
 
-        for file_path in self._walk_directory(self.root_path):
-            relative_path = file_path.relative_to(self.root_path)
+        Args:
+            file_path: Absolute path as returned by walk_once() or select_paths().
 
-            # Check for README files at root level (README.md, README, README.txt, etc.)
-            if (
-                file_path.name.lower().startswith("readme")
-                and len(relative_path.parts) == 1
-            ):
-                # Prefer README.md over other README variants
-                if readme_file is None or file_path.name.lower() == "readme.md":
-                    readme_file = file_path
-                else:
-                    files.append(file_path)
-            elif self._is_text_file(file_path):
-                files.append(file_path)
+        Returns:
+            The extension including the dot ("" if there is none), or None
+            for files included on other grounds (e.g. README variants).
+        """
+        return self._suffixes.get(file_path)
 
-        # Sort files by path for consistent output
-        files.sort(key=lambda p: str(p.relative_to(self.root_path)).lower())
+    def _is_pdf_file(self, file_path: Path) -> bool:
+        """Check if a file is a PDF."""
+        return file_path.suffix.lower() == ".pdf"
 
-        # Ensure README is first if it exists
-        if readme_file:
-            files.insert(0, readme_file)
+    def sparse_checkout_patterns(self) -> list[str]:
+        """
+        Build sparse-checkout patterns matching the files that can be included.
 
-        return files
+        Extension patterns are case-insensitive, mirroring how suffixes are
+        matched during discovery, and excluded directories are negated so
+        their contents are never checked out.
 
-    def _walk_directory(self, directory: Path) -> Iterator[Path]:
+        Returns:
+            Gitignore-style (non-cone) sparse-checkout patterns.
         """
-        Walk through directory yielding files, respecting exclusions.
+        patterns = [f"*{_case_insensitive_glob(ext)}" for ext in sorted(self.text_extensions)]
+        patterns.extend(sorted(self.include_filenames))
+        # README variants at the root are included regardless of extension
+        patterns.append(f"/{_case_insensitive_glob('readme')}*")
+        patterns.extend(f"!**/{name}/**" for name in sorted(self.exclude_dirs))
+        # Remove duplicates (e.g. ".r" and ".R") while preserving order
+        return list(dict.fromkeys(patterns))
 
-        Args:
-            directory: Directory to walk.
+    def discover_files(self) -> list[Path]:
+        """
+        Discover all relevant files in the repository.
 
-        Yields:
-            File paths.
+        Returns:
+            List of file paths sorted with README first if present.
         """
-        try:
-            for entry in directory.iterdir():
-                if entry.is_dir():
-                    if not self._should_exclude_dir(entry.name):
-                        yield from self._walk_directory(entry)
-                elif entry.is_file():
-                    yield entry
-        except PermissionError:
-            pass  # Skip directories we can't access
+        files, _ = self.walk_once()
+        return [Path(f) for f in files]
 
     def get_text_files(self) -> list[Path]:
         """Get all text-based files (excluding PDFs)."""
@@ -317,43 +417,262 @@ class FileDiscovery:
             String representation of the directory tree.
         """
         lines: list[str] = [self.root_path.name + "/"]
-        self._build_tree(self.root_path, "", lines, 0, max_depth)
+        self._walk(max_depth, None, None, lines)
         return "\n".join(lines)
 
-    def _build_tree(
+    def walk_once(self, max_depth: int | None = None) -> tuple[list[str], str]:
+        """
+        Discover files and build the directory tree in a single traversal.
+
+        Args:
+            max_depth: Maximum depth to display in the tree (None for unlimited).
+                Files below this depth are still discovered.
+
+        Returns:
+            Tuple of (absolute file paths as strings, sorted with README first,
+            tree string).
+        """
+        candidates: list[tuple[str, str]] = []
+        readmes: list[tuple[str, str]] = []
+        lines: list[str] = [self.root_path.name + "/"]
+        self._walk(max_depth, candidates, readmes, lines)
+        return self._select_files(candidates, readmes), "\n".join(lines)
+
+    def select_paths(
+        self,
+        relative_paths: Iterable[str],
+        max_depth: int | None = None,
+        stat_files: bool = False,
+    ) -> tuple[list[str], str]:
+        """
+        Filter repository paths and build the tree without walking the disk.
+
+        Useful when the file list comes from Git rather than a directory walk.
+        Unlike walk_once(), the tree only lists directories that contain
+        included files.
+
+        Args:
+            relative_paths: POSIX paths relative to the repository root.
+            max_depth: Maximum depth to display in the tree (None for unlimited).
+            stat_files: Whether the files exist under root_path and should be
+                checked against max_file_size. Only included files are stat'ed.
+
+        Returns:
+            Tuple of (absolute file paths as strings, sorted with README first,
+            tree string).
+        """
+        root = str(self.root_path)
+        candidates: list[tuple[str, str]] = []
+        readmes: list[tuple[str, str]] = []
+        tree_root: dict[str, dict | None] = {}
+
+        split_paths = [relative_path.split("/") for relative_path in relative_paths]
+        suffixes = self._classify_names([parts[-1] for parts in split_paths])
+
+        for (*dir_names, name), suffix in zip(split_paths, suffixes, strict=True):
+            if any(self._should_exclude_dir(d) for d in dir_names):
+                continue
+
+            # Root-level README variants are kept whatever their extension;
+            # only root paths are checked for them
+            is_readme = not dir_names and name.lower().startswith("readme")
+            included = suffix is not None
+            if not (included or is_readme):
+                continue
+
+            relative_path = os.sep.join([*dir_names, name])
+            file_path = os.path.join(root, relative_path)
+            if stat_files and not self._within_size_limit(file_path):
+                continue
+            (readmes if is_readme else candidates).append((relative_path, file_path))
+
+            if suffix is not None:
+                self._suffixes[file_path] = suffix
+                # Only show files we would include
+                node = tree_root
+                for dir_name in dir_names:
+                    node = node.setdefault(dir_name, {})
+                node[name] = None
+
+        lines: list[str] = [self.root_path.name + "/"]
+        self._render_tree(tree_root, max_depth, lines)
+        return self._select_files(candidates, readmes), "\n".join(lines)
+
+    def _render_tree(
         self,
-        directory: Path,
-        prefix: str,
+        tree_root: dict[str, dict | None],
+        max_depth: int | None,
         lines: list[str],
-        current_depth: int,
+    ) -> None:
+        """
+        Render a nested dict of directories (files map to None) as tree lines.
+
+        Uses the same explicit stack of pending lines and directories as _walk().
+        """
+        # Directory frames are (node, prefix, depth)
+        stack: list[str | tuple[dict[str, dict | None], str, int]] = [(tree_root, "", 0)]
+
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                lines.append(item)
+                continue
+
+            node, prefix, current_depth = item
+            if max_depth is not None and current_depth >= max_depth:
+                continue
+
+            entries = sorted(node.items(), key=lambda e: (e[1] is None, e[0].lower()))
+            pending: list[str | tuple[dict[str, dict | None], str, int]] = []
+
+            for i, (name, child) in enumerate(entries):
+                is_last = i == len(entries) - 1
+                connector = "└── " if is_last else "├── "
+
+                if child is None:
+                    pending.append(f"{prefix}{connector}{name}")
+                else:
+                    pending.append(f"{prefix}{connector}{name}/")
+                    extension = "    " if is_last else "│   "
+                    pending.append((child, prefix + extension, current_depth + 1))
+
+            stack.extend(reversed(pending))
+
+    def _select_files(
+        self,
+        candidates: list[tuple[str, str]],
+        readmes: list[tuple[str, str]],
+    ) -> list[str]:
+        """
+        Order included files with README first.
+
+        Args:
+            candidates: Tuples of (path relative to the root, absolute path)
+                for files that passed the inclusion checks.
+            readmes: Same tuples for README variants found at the root.
+        """
+        readme_file: str | None = None
+        if readmes:
+            # Prefer README.md over other README variants
+            preferred = next(
+                (r for r in readmes if r[0].lower() == "readme.md"), readmes[0]
+            )
+            readme_file = preferred[1]
+            candidates = candidates + [r for r in readmes if r is not preferred]
+
+        # Sort files by path for consistent output; keys are computed once
+        keyed_files = [(relative_path.casefold(), p) for relative_path, p in candidates]
+        keyed_files.sort(key=itemgetter(0))
+        files = [file_path for _, file_path in keyed_files]
+
+        # Ensure README is first if it exists
+        if readme_file:
+            files.insert(0, readme_file)
+
+        return files
+
+    def _walk(
+        self,
         max_depth: int | None,
+        files: list[tuple[str, str]] | None,
+        readmes: list[tuple[str, str]] | None,
+        lines: list[str],
     ) -> None:
-        """Recursively build the tree structure."""
-        if max_depth is not None and current_depth >= max_depth:
-            return
+        """
+        Collect files, root README variants and tree lines for the repository.
 
-        try:
-            entries = sorted(directory.iterdir(), key=lambda e: (not e.is_dir(), e.name.lower()))
-        except PermissionError:
-            return
-
-        # Filter out excluded directories
-        entries = [
-            e for e in entries
-            if not (e.is_dir() and self._should_exclude_dir(e.name))
-        ]
+        When files and readmes are None only the tree is built: directories
+        below max_depth are not listed, and files are not checked against
+        max_file_size.
 
-        for i, entry in enumerate(entries):
-            is_last = i == len(entries) - 1
-            connector = "└── " if is_last else "├── "
-            
-            if entry.is_dir():
-                lines.append(f"{prefix}{connector}{entry.name}/")
-                extension = "    " if is_last else "│   "
-                self._build_tree(
-                    entry, prefix + extension, lines, current_depth + 1, max_depth
-                )
-            else:
-                # Only show files we would include
-                if self._is_text_file(entry) or (self.include_pdf and self._is_pdf_file(entry)):
-                    lines.append(f"{prefix}{connector}{entry.name}")
+        Uses an explicit stack instead of recursion. The stack holds either
+        a directory still to be listed or a tree line ready to be emitted,
+        pushed in reverse so lines come out in depth-first order.
+
+        Excluded directories are pruned before descending into them, so
+        their contents are never listed. Symbolic links are skipped, as in
+        clones and bare clones. Relative paths are built by
+        concatenation while descending, and paths stay plain strings; no
+        Path objects are built.
+        """
+        # Directory frames are (path, relative_dir, prefix, depth)
+        stack: list[str | tuple[str, str, str, int]] = [(str(self.root_path), "", "", 0)]
+
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                lines.append(item)
+                continue
+
+            directory, relative_dir, prefix, current_depth = item
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(
+                        it,
+                        key=lambda e: (not e.is_dir(follow_symlinks=False), e.name.lower()),
+                    )
+            except PermissionError:
+                continue  # Skip directories we can't access
+
+            # Filter out symbolic links, which Git-based discovery skips as
+            # well and which may point outside the repository, and excluded
+            # directories
+            entries = [
+                e for e in entries
+                if not e.is_symlink()
+                and not (e.is_dir(follow_symlinks=False) and self._should_exclude_dir(e.name))
+            ]
+
+            suffixes = self._classify_names([e.name for e in entries])
+            # README variants are only looked for in the root listing
+            at_root = current_depth == 0
+            show_in_tree = max_depth is None or current_depth < max_depth
+            # Without files to collect, subdirectories are only worth listing
+            # if their contents will show up in the tree
+            descend = (
+                files is not None or max_depth is None or current_depth + 1 < max_depth
+            )
+            pending: list[str | tuple[str, str, str, int]] = []
+
+            for i, entry in enumerate(entries):
+                is_last = i == len(entries) - 1
+                connector = "└── " if is_last else "├── "
+
+                # DirEntry caches the file type from the directory listing,
+                # so these checks don't need an extra stat() call
+                if entry.is_dir(follow_symlinks=False):
+                    if show_in_tree:
+                        pending.append(f"{prefix}{connector}{entry.name}/")
+                    if descend:
+                        extension = "    " if is_last else "│   "
+                        pending.append(
+                            (
+                                entry.path,
+                                relative_dir + entry.name + os.sep,
+                                prefix + extension,
+                                current_depth + 1,
+                            )
+                        )
+                elif files is None or readmes is None:
+                    if show_in_tree and suffixes[i] is not None:
+                        pending.append(f"{prefix}{connector}{entry.name}")
+                else:
+                    name = entry.name
+                    suffix = suffixes[i]
+                    included = suffix is not None
+                    # Root-level README variants are kept whatever their extension
+                    is_readme = at_root and name.lower().startswith("readme")
+                    # Oversized files are dropped before they are ever opened
+                    if not (included or is_readme) or not self._within_size_limit(entry):
+                        continue
+                    if entry.is_file():
+                        (readmes if is_readme else files).append(
+                            (relative_dir + name, entry.path)
+                        )
+                        if suffix is not None:
+                            self._suffixes[entry.path] = suffix
+                    # Only show files we would include
+                    if show_in_tree and included:
+                        pending.append(f"{prefix}{connector}{name}")
+
+            stack.extend(reversed(pending))
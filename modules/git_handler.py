@@ -7,29 +7,40 @@ Provides functionality to clone remote repositories or use local repositories.
 import contextlib
 import shutil
 import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 from urllib.parse import urlparse
 
-from git import Repo
+from git import Blob, Repo
 from git.exc import GitCommandError, InvalidGitRepositoryError
 
 
 class GitHandler:
     """Handles Git repository operations including cloning and validation."""
 
-    def __init__(self, repo_source: str, temp_dir: Path | None = None):
+    def __init__(
+        self,
+        repo_source: str,
+        temp_dir: Path | None = None,
+        sparse: bool = False,
+    ):
         """
         Initialize the Git handler.
 
         Args:
             repo_source: Either a Git URL or a local path to a repository.
             temp_dir: Optional custom temporary directory for cloning.
+            sparse: Whether to make a partial, sparse clone of remote
+                repositories. Only root-level files are checked out until
+                sparse_checkout() is called.
         """
         self.repo_source = repo_source
         self.temp_dir = temp_dir
+        self.sparse = sparse
         self._repo: Repo | None = None
         self._cloned_path: Path | None = None
         self._is_temp: bool = False
+        self._is_sparse: bool = False
 
     @property
     def repo_path(self) -> Path:
@@ -74,8 +85,8 @@ class GitHandler:
             return self._clone_repository()
         return self._load_local_repository()
 
-    def _clone_repository(self) -> Path:
-        """Clone a remote repository to a temporary directory."""
+    def _prepare_clone_path(self) -> Path:
+        """Create the directory a remote repository is cloned into."""
         if self.temp_dir:
             clone_path = self.temp_dir / self.repo_name
             clone_path.mkdir(parents=True, exist_ok=True)
@@ -83,19 +94,86 @@ class GitHandler:
             self._temp_base = tempfile.mkdtemp(prefix="git2md_")
             clone_path = Path(self._temp_base) / self.repo_name
             self._is_temp = True
+        return clone_path
+
+    def _clone_repository(self) -> Path:
+        """Clone a remote repository to a temporary directory."""
+        clone_path = self._prepare_clone_path()
 
         try:
+            multi_options: list[str] = []
+            if self.sparse:
+                # Skip blob downloads until a path is actually checked out
+                multi_options = ["--filter=blob:none", "--sparse"]
+
             self._repo = Repo.clone_from(
                 self.repo_source,
                 clone_path,
+                multi_options=multi_options,
                 depth=1,  # Shallow clone for efficiency
             )
+            self._is_sparse = self.sparse
             self._cloned_path = clone_path
             return self._cloned_path
         except GitCommandError as e:
             self.cleanup()
             raise ValueError(f"Failed to clone repository: {e}") from e
 
+    @property
+    def is_cloned(self) -> bool:
+        """Whether the repository was cloned from a remote source."""
+        return self._cloned_path is not None and self._is_url(self.repo_source)
+
+    def list_tracked_files(self) -> list[str] | None:
+        """
+        List the files tracked at HEAD with a single `git ls-tree` call.
+
+        Symbolic links and submodules are skipped. Blob sizes are not
+        requested, so partial clones don't download any file contents.
+
+        Returns:
+            POSIX paths relative to the repository root, or None if the
+            source is not a Git repository or has no commits.
+        """
+        if self._repo is None:
+            return None
+
+        try:
+            output = self._repo.git.ls_tree("-r", "-z", "HEAD")
+        except GitCommandError:
+            return None
+
+        paths: list[str] = []
+        # Records look like "<mode> <type> <object>\t<path>"
+        for record in output.split("\0"):
+            if not record:
+                continue
+            info, _, path = record.partition("\t")
+            mode, object_type, _ = info.split(" ", 2)
+            if object_type == "blob" and mode != "120000":
+                paths.append(path)
+        return paths
+
+    def sparse_checkout(self, patterns: list[str]) -> None:
+        """
+        Restrict the working tree of a sparse clone to the given patterns.
+
+        Blobs for paths outside the patterns are never downloaded. Does
+        nothing for local repositories or full clones.
+
+        Args:
+            patterns: Gitignore-style (non-cone) sparse-checkout patterns.
+        """
+        if not self._is_sparse or self._repo is None:
+            return
+
+        try:
+            self._repo.git.sparse_checkout("set", "--no-cone", *patterns)
+        except GitCommandError:
+            # Git without non-cone support: fall back to a full checkout
+            with contextlib.suppress(GitCommandError):
+                self._repo.git.sparse_checkout("disable")
+
     def _load_local_repository(self) -> Path:
         """Load and validate a local repository."""
         local_path = Path(self.repo_source).resolve()
@@ -130,3 +208,93 @@ class GitHandler:
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         """Context manager exit with cleanup."""
         self.cleanup()
+
+
+class BareGitHandler(GitHandler):
+    """
+    Git handler that reads remote repositories from a bare clone.
+
+    Remote repositories are cloned without a working tree and file contents
+    are read directly from the object database. Local sources are handled
+    exactly like GitHandler, so uncommitted changes are still picked up.
+    """
+
+    def __init__(self, repo_source: str, temp_dir: Path | None = None):
+        """
+        Initialize the bare Git handler.
+
+        Args:
+            repo_source: Either a Git URL or a local path to a repository.
+            temp_dir: Optional custom temporary directory for cloning.
+        """
+        super().__init__(repo_source, temp_dir)
+        self._export_dir: Path | None = None
+
+    @property
+    def is_bare(self) -> bool:
+        """Whether the repository was loaded as a bare clone."""
+        return self._repo is not None and self._repo.bare
+
+    def _clone_repository(self) -> Path:
+        """Clone a remote repository without a working tree."""
+        clone_path = self._prepare_clone_path()
+
+        try:
+            # No blob filter here: blobs are read one by one, and lazily
+            # fetching each of them would cost a round trip per file
+            self._repo = Repo.clone_from(
+                self.repo_source,
+                clone_path,
+                bare=True,
+                depth=1,  # Shallow clone for efficiency
+            )
+            self._cloned_path = clone_path
+            return self._cloned_path
+        except GitCommandError as e:
+            self.cleanup()
+            raise ValueError(f"Failed to clone repository: {e}") from e
+
+    def iter_blobs(self) -> Iterator[tuple[str, Blob]]:
+        """
+        Iterate over the files of the HEAD commit.
+
+        Symbolic links and submodules are skipped.
+
+        Yields:
+            Tuples of (relative POSIX path, blob).
+
+        Raises:
+            ValueError: If the repository is not a bare clone.
+        """
+        if self._repo is None or not self.is_bare:
+            raise ValueError("Repository is not a bare clone. Call load() first.")
+
+        for item in self._repo.head.commit.tree.traverse():
+            if isinstance(item, Blob) and item.mode != Blob.link_mode:
+                yield item.path, item
+
+    def export_blob(self, blob: Blob) -> Path:
+        """
+        Write a blob to a temporary file for readers that need a real path.
+
+        Args:
+            blob: Blob to export.
+
+        Returns:
+            Path to the exported file, removed on cleanup().
+        """
+        if self._export_dir is None:
+            self._export_dir = Path(tempfile.mkdtemp(prefix="git2md_export_"))
+
+        target = self._export_dir / blob.path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "wb") as f:
+            blob.stream_data(f)
+        return target
+
+    def cleanup(self) -> None:
+        """Clean up temporary resources, including exported blobs."""
+        super().cleanup()
+        if self._export_dir is not None:
+            shutil.rmtree(self._export_dir, ignore_errors=True)
+            self._export_dir = None
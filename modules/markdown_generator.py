@@ -4,11 +4,96 @@ Markdown generation and formatting module.
 Provides functionality to generate the final Markdown output from repository contents.
 """
 
-from dataclasses import dataclass
+import contextlib
+import hashlib
+import io
+import os
+import re
+import warnings
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
-
-@dataclass
+# Write buffer used when streaming output to a file (1 MiB)
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Fixed pieces of the document, so only the variable parts are formatted
+_TREE_HEADER = "## Repository Structure\n\n```\n"
+_TREE_FOOTER = "\n```"
+_TOC_HEADER = "## Table of Contents\n"
+_FILES_HEADER = "\n\n## File Contents\n"
+_PDF_MARKER = "**Type:** PDF (extracted text)\n"
+_CONTINUATION_HEADER = "# Repository: {} (continued)\n\n## File Contents (continued)\n"
+
+# Writer threads for chunked output, also the number of chunks held in memory
+CHUNK_WRITE_WORKERS = 8
+
+# Flags for creating output files; O_BINARY only exists on Windows
+_OUTPUT_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+# Runs of characters that are not alphanumeric (as in str.isalnum()) and
+# become a single hyphen in anchors; \w is alphanumerics plus underscore.
+# One regex pass beats a str.translate slug table, which still needs a
+# second regex pass to collapse the hyphens it produces.
+_ANCHOR_SEPARATOR_RE = re.compile(r"[\W_]+")
+
+# Runs of backticks, to size code fences around file contents
+_BACKTICK_RUN_RE = re.compile(r"`+")
+
+
+def _utf8_len(text: str) -> int:
+    """Get the UTF-8 encoded size of text, without encoding ASCII text."""
+    # isascii() reads a flag on the string object; no scan needed
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def _resolve_max_bytes(max_bytes: int, max_chars: int | None) -> int:
+    """Apply the deprecated max_chars alias of a max_bytes parameter."""
+    if max_chars is None:
+        return max_bytes
+    warnings.warn(
+        "max_chars is deprecated, use max_bytes instead",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+    return max_chars
+
+
+def _code_fence(content: str) -> str:
+    """Get a backtick fence longer than any backtick run in content."""
+    # Most files have no fence-like run at all, so skip the regex scan
+    if "```" not in content:
+        return "```"
+    longest = max(len(run) for run in _BACKTICK_RUN_RE.findall(content))
+    return "`" * (longest + 1)
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """Reserve disk space for a file about to be written, where supported."""
+    if size <= 0 or not hasattr(os, "posix_fallocate"):
+        return
+    # Not every filesystem supports it; writing works the same without
+    with contextlib.suppress(OSError):
+        os.posix_fallocate(fd, 0, size)
+
+
+def _write_output(output_path: Path, content: str) -> None:
+    """Write Markdown as UTF-8 into a file preallocated to its final size."""
+    data = memoryview(content.encode("utf-8"))
+    fd = os.open(output_path, _OUTPUT_OPEN_FLAGS, 0o666)
+    try:
+        _preallocate(fd, len(data))
+        # os.write() may write less than asked, so loop over the rest
+        while data:
+            written = os.write(fd, data[:OUTPUT_BUFFER_SIZE])
+            data = data[written:]
+    finally:
+        os.close(fd)
+
+
+@dataclass(slots=True)
 class FileContent:
     """Represents a file's content and metadata."""
 
@@ -17,6 +102,14 @@ class FileContent:
     content: str
     language: str
     is_pdf: bool = False
+    # Whether content is a message standing in for unreadable contents
+    is_placeholder: bool = False
+    # Relative path of an earlier file with identical content (dedupe mode)
+    duplicate_of: str | None = None
+    # Formatted Markdown, its UTF-8 size and TOC anchor, filled in by MarkdownGenerator
+    _rendered: str | None = field(default=None, init=False, repr=False, compare=False)
+    _rendered_len: int = field(default=0, init=False, repr=False, compare=False)
+    _anchor: str | None = field(default=None, init=False, repr=False, compare=False)
 
 
 class MarkdownGenerator:
@@ -28,6 +121,7 @@ class MarkdownGenerator:
         include_tree: bool = True,
         include_toc: bool = False,
         max_tree_depth: int | None = None,
+        dedupe: bool = False,
     ):
         """
         Initialize the Markdown generator.
@@ -37,13 +131,18 @@ class MarkdownGenerator:
             include_tree: Whether to include directory tree at the start.
             include_toc: Whether to include a table of contents.
             max_tree_depth: Maximum depth for the directory tree.
+            dedupe: Whether to replace the body of files identical to an
+                earlier file with a reference to it.
         """
         self.repo_name = repo_name
         self.include_tree = include_tree
         self.include_toc = include_toc
         self.max_tree_depth = max_tree_depth
+        self.dedupe = dedupe
         self._files: list[FileContent] = []
         self._tree: str = ""
+        # Content digest -> relative path of the first file with that content
+        self._first_seen: dict[bytes, str] = {}
 
     def set_tree(self, tree: str) -> None:
         """Set the directory tree string."""
@@ -51,183 +150,288 @@ class MarkdownGenerator:
 
     def add_file(self, file_content: FileContent) -> None:
         """Add a file to the output."""
+        file_content._rendered = file_content._anchor = None
+        if self.dedupe:
+            self._mark_duplicate(file_content)
         self._files.append(file_content)
 
     def add_files(self, file_contents: list[FileContent]) -> None:
         """Add multiple files to the output."""
-        self._files.extend(file_contents)
-
-    def generate(self) -> str:
+        for file_content in file_contents:
+            self.add_file(file_content)
+
+    def _mark_duplicate(self, file_content: FileContent) -> None:
+        """Point a file at the first added file with the same content, if any."""
+        # An empty body is shorter than the reference that would replace it,
+        # and placeholders are only alike because the files weren't read
+        if not file_content.content or file_content.is_placeholder:
+            return
+        digest = hashlib.blake2b(
+            file_content.content.encode("utf-8"), digest_size=16
+        ).digest()
+        first = self._first_seen.setdefault(digest, file_content.relative_path)
+        if first != file_content.relative_path:
+            file_content.duplicate_of = first
+
+    def generate(self, cache: bool = False) -> str:
         """
         Generate the complete Markdown output.
 
+        Args:
+            cache: Whether to keep each file's rendering for later calls,
+                e.g. when the same files are split into chunks afterwards.
+
         Returns:
             Complete Markdown document as a string.
         """
-        sections: list[str] = []
+        buffer = io.StringIO()
+        self._write_document(buffer.write, cache)
+        return buffer.getvalue()
+
+    def generate_bytes(self) -> bytes:
+        """
+        Generate the complete Markdown output encoded as UTF-8.
+
+        Returns:
+            Complete Markdown document as bytes.
+        """
+        buffer = io.BytesIO()
+        self._generate_bytes_stream(buffer.write)
+        return buffer.getvalue()
+
+    def _generate_bytes_stream(self, write: Callable[[bytes], object]) -> None:
+        """Write the UTF-8 encoded document piece by piece, one file at a time."""
+        header = io.StringIO()
+        self._write_header(header.write)
+        write(header.getvalue().encode("utf-8"))
+
+        # File contents, with an empty line between files; each file is
+        # encoded exactly once
+        for _, rendered in self._iter_formatted(cache=False):
+            write(b"\n")
+            write(rendered.encode("utf-8"))
+            write(b"\n")
+
+    def generate_stream(self, write: Callable[[str], object]) -> None:
+        """
+        Write the complete Markdown output piece by piece.
+
+        Passing a file's write method streams the document to disk without
+        ever holding it whole in memory.
 
+        Args:
+            write: Callable receiving consecutive fragments of the document.
+        """
+        # Nothing is cached: streaming shouldn't keep a second copy of
+        # every file
+        self._write_document(write, cache=False)
+
+    def _write_document(self, write: Callable[[str], object], cache: bool) -> None:
+        """Write the header and every file, with an empty line between files."""
+        self._write_header(write)
+        for _, rendered in self._iter_formatted(cache=cache):
+            write("\n")
+            write(rendered)
+            write("\n")
+
+    def _write_header(self, write: Callable[[str], object]) -> None:
+        """Write the title, tree and table of contents, up to the file section."""
         # Title
-        sections.append(self._generate_title())
+        write(f"# Repository: {self.repo_name}")
 
         # Directory tree
         if self.include_tree and self._tree:
-            sections.append(self._generate_tree_section())
+            write("\n\n")
+            self._write_tree_section(write)
 
         # Table of contents (optional)
         if self.include_toc:
-            sections.append(self._generate_toc())
+            write("\n\n")
+            self._write_toc(write)
+
+        write(_FILES_HEADER)
+
+    def _write_tree_section(self, write: Callable[[str], object]) -> None:
+        """Write the directory tree section."""
+        write(_TREE_HEADER)
+        write(self._tree)
+        write(_TREE_FOOTER)
+
+    def _write_toc(self, write: Callable[[str], object]) -> None:
+        """Write the table of contents."""
+        write(_TOC_HEADER)
+        write(
+            "".join(
+                [
+                    f"\n- [{f.relative_path}](#{self._file_anchor(f)})"
+                    for f in self._files
+                ]
+            )
+        )
+
+    def _file_anchor(self, file_content: FileContent) -> str:
+        """Get the anchor-friendly link for a file, computing it once."""
+        if file_content._anchor is None:
+            file_content._anchor = self._create_anchor(file_content.relative_path)
+        return file_content._anchor
 
-        # File contents
-        sections.append(self._generate_files_section())
+    def _create_anchor(self, text: str) -> str:
+        """Create a Markdown anchor from text."""
+        # Lowercase, turn each run of non-alphanumeric chars into a single
+        # hyphen, and remove leading/trailing hyphens
+        return _ANCHOR_SEPARATOR_RE.sub("-", text.lower()).strip("-")
+
+    def _write_file(
+        self, file_content: FileContent, write: Callable[[str], object]
+    ) -> None:
+        """Write a single file formatted for Markdown output."""
+        # File header with name and path
+        write(f"### {file_content.path.name}\n**Path:** `{file_content.relative_path}`\n")
 
-        return "\n\n".join(sections)
+        # Add PDF indicator if applicable
+        if file_content.is_pdf:
+            write(_PDF_MARKER)
 
-    def _generate_title(self) -> str:
-        """Generate the document title."""
-        return f"# Repository: {self.repo_name}"
+        # Duplicates only point at the file that carries the content
+        if file_content.duplicate_of is not None:
+            write(f"**Duplicate of:** `{file_content.duplicate_of}`")
+            return
 
-    def _generate_tree_section(self) -> str:
-        """Generate the directory tree section."""
-        lines = [
-            "## Repository Structure",
-            "",
-            "```",
-            self._tree,
-            "```",
-        ]
-        return "\n".join(lines)
+        # File content in a code block whose fence is longer than any
+        # backtick run in the content, so the content can't close it early
+        fence = _code_fence(file_content.content)
+        write(f"\n{fence}{file_content.language or ''}\n")
+        write(file_content.content)
+        write(f"\n{fence}")
 
-    def _generate_toc(self) -> str:
-        """Generate the table of contents."""
-        lines = ["## Table of Contents", ""]
+    def _render_file(self, file_content: FileContent) -> str:
+        """Format a single file for Markdown output."""
+        buffer = io.StringIO()
+        self._write_file(file_content, buffer.write)
+        return buffer.getvalue()
 
-        for file_content in self._files:
-            # Create anchor-friendly link
-            anchor = self._create_anchor(file_content.relative_path)
-            lines.append(f"- [{file_content.relative_path}](#{anchor})")
+    def _format_file(self, file_content: FileContent) -> str:
+        """Format a single file for Markdown output, caching the result."""
+        if file_content._rendered is None:
+            file_content._rendered = self._render_file(file_content)
+            file_content._rendered_len = _utf8_len(file_content._rendered)
+        return file_content._rendered
 
-        return "\n".join(lines)
+    def _iter_formatted(self, cache: bool = True) -> Iterator[tuple[FileContent, str]]:
+        """
+        Yield each file with its formatted Markdown.
 
-    def _create_anchor(self, text: str) -> str:
-        """Create a Markdown anchor from text."""
-        # Convert to lowercase and replace non-alphanumeric chars with hyphens
-        anchor = text.lower()
-        anchor = "".join(c if c.isalnum() or c == "-" else "-" for c in anchor)
-        # Remove consecutive hyphens
-        while "--" in anchor:
-            anchor = anchor.replace("--", "-")
-        # Remove leading/trailing hyphens
-        return anchor.strip("-")
-
-    def _generate_files_section(self) -> str:
-        """Generate the file contents section."""
-        lines = ["## File Contents", ""]
+        Every output path renders files through here. Existing renderings
+        are always reused.
 
+        Args:
+            cache: Whether to keep new renderings (and their UTF-8 size) on
+                their FileContent.
+        """
         for file_content in self._files:
-            lines.append(self._format_file(file_content))
-            lines.append("")  # Empty line between files
-
-        return "\n".join(lines)
-
-    def _format_file(self, file_content: FileContent) -> str:
-        """Format a single file for Markdown output."""
-        lines = []
-
-        # File header with name and path
-        lines.append(f"### {file_content.path.name}")
-        lines.append(f"**Path:** `{file_content.relative_path}`")
-
-        # Add PDF indicator if applicable
-        if file_content.is_pdf:
-            lines.append("**Type:** PDF (extracted text)")
-
-        lines.append("")
-
-        # File content in code block
-        lang = file_content.language if file_content.language else ""
-        
-        # For markdown files, we might want to handle them specially
-        # to avoid nested markdown issues
-        if file_content.language == "markdown":
-            lines.append(f"```{lang}")
-            lines.append(file_content.content)
-            lines.append("```")
-        else:
-            lines.append(f"```{lang}")
-            lines.append(file_content.content)
-            lines.append("```")
-
-        return "\n".join(lines)
-
-    def generate_to_file(self, output_path: Path) -> None:
+            if file_content._rendered is not None:
+                yield file_content, file_content._rendered
+            elif cache:
+                yield file_content, self._format_file(file_content)
+            else:
+                yield file_content, self._render_file(file_content)
+
+    def generate_to_file(self, output_path: Path, content: str | None = None) -> None:
         """
         Generate and write Markdown to a file.
 
         Args:
             output_path: Path to write the output file.
+            content: Already generated Markdown to write, to avoid rendering
+                the document a second time.
         """
-        content = self.generate()
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(content, encoding="utf-8")
-
-    def generate_chunked(self, max_chars: int = 100_000) -> list[str]:
+        if content is not None:
+            _write_output(output_path, content)
+            return
+
+        # Stream each file's encoded Markdown through a large buffer instead
+        # of building the whole document first
+        with open(output_path, "wb", buffering=OUTPUT_BUFFER_SIZE) as f:
+            # The file contents are most of the document, so their size is
+            # a good hint; any excess is cut off once writing is done
+            _preallocate(f.fileno(), self.get_total_size())
+            self._generate_bytes_stream(f.write)
+            f.flush()
+            os.ftruncate(f.fileno(), f.tell())
+
+    def generate_chunked(
+        self, max_bytes: int = 100_000, max_chars: int | None = None
+    ) -> list[str]:
         """
         Generate Markdown output split into chunks.
 
-        Each chunk will not exceed max_chars, and individual files are never
-        split across chunks.
+        Each chunk will not exceed max_bytes once encoded as UTF-8, and
+        individual files are never split across chunks.
 
         Args:
-            max_chars: Maximum characters per chunk (default: 100,000).
+            max_bytes: Maximum UTF-8 bytes per chunk (default: 100,000).
+            max_chars: Deprecated alias for max_bytes.
 
         Returns:
             List of Markdown strings, one per chunk.
         """
-        chunks: list[str] = []
-        current_chunk_parts: list[str] = []
-        current_chunk_size = 0
-
-        # Generate header (title + tree + toc) - included in first chunk only
-        header_parts: list[str] = []
-        header_parts.append(self._generate_title())
-        if self.include_tree and self._tree:
-            header_parts.append(self._generate_tree_section())
-        if self.include_toc:
-            header_parts.append(self._generate_toc())
+        return list(self._iter_chunks(_resolve_max_bytes(max_bytes, max_chars)))
 
-        header = "\n\n".join(header_parts)
-        header_with_section = header + "\n\n## File Contents\n"
-
-        current_chunk_parts.append(header_with_section)
-        current_chunk_size = len(header_with_section)
+    def _iter_chunks(self, max_bytes: int, cache: bool = False) -> Iterator[str]:
+        """
+        Yield chunks one at a time, as described in generate_chunked().
 
-        # Process each file
-        for file_content in self._files:
-            file_markdown = self._format_file(file_content) + "\n"
-            file_size = len(file_markdown)
+        Args:
+            max_bytes: Maximum UTF-8 bytes per chunk.
+            cache: Whether to keep new renderings on their FileContent.
+                Renderings cached earlier (e.g. by generate()) are reused
+                either way.
+        """
+        # Generate header (title + tree + toc) - included in first chunk only
+        buffer = io.StringIO()
+        self._write_header(buffer.write)
+        current_chunk_size = _utf8_len(buffer.getvalue())
+        chunk_has_files = False
+
+        continuation_header = _CONTINUATION_HEADER.format(self.repo_name)
+        continuation_len = _utf8_len(continuation_header)
+
+        # Process each file. Sizes count the newline separating it from the
+        # previous part as well as its trailing newline.
+        for file_content, file_markdown in self._iter_formatted(cache=cache):
+            rendered_len = (
+                file_content._rendered_len
+                if file_content._rendered is not None
+                else _utf8_len(file_markdown)
+            )
+            file_size = rendered_len + 2
 
             # Check if adding this file would exceed the limit
-            if current_chunk_size + file_size > max_chars and current_chunk_parts:
+            if current_chunk_size + file_size > max_bytes:
                 # Save current chunk (if it has more than just the header)
-                if len(current_chunk_parts) > 1 or current_chunk_size > len(header_with_section):
-                    chunks.append("\n".join(current_chunk_parts))
+                if chunk_has_files:
+                    yield buffer.getvalue()
 
                 # Start new chunk with continuation header
-                continuation_header = f"# Repository: {self.repo_name} (continued)\n\n## File Contents (continued)\n"
-                current_chunk_parts = [continuation_header]
-                current_chunk_size = len(continuation_header)
+                buffer = io.StringIO()
+                buffer.write(continuation_header)
+                current_chunk_size = continuation_len
 
-            current_chunk_parts.append(file_markdown)
+            buffer.write("\n")
+            buffer.write(file_markdown)
+            buffer.write("\n")
             current_chunk_size += file_size
+            chunk_has_files = True
 
-        # Add the last chunk if it has content
-        if current_chunk_parts:
-            chunks.append("\n".join(current_chunk_parts))
-
-        return chunks
+        # Add the last chunk
+        yield buffer.getvalue()
 
     def generate_chunked_to_files(
-        self, output_path: Path, max_chars: int = 100_000
+        self,
+        output_path: Path,
+        max_bytes: int = 100_000,
+        max_chars: int | None = None,
     ) -> list[Path]:
         """
         Generate chunked Markdown and write to multiple files.
@@ -237,29 +441,39 @@ class MarkdownGenerator:
 
         Args:
             output_path: Base path for output files.
-            max_chars: Maximum characters per chunk.
+            max_bytes: Maximum UTF-8 bytes per file.
+            max_chars: Deprecated alias for max_bytes.
 
         Returns:
             List of paths to generated files.
         """
-        chunks = self.generate_chunked(max_chars)
+        max_bytes = _resolve_max_bytes(max_bytes, max_chars)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        if len(chunks) == 1:
-            # Single file - use original name
-            output_path.write_text(chunks[0], encoding="utf-8")
-            return [output_path]
-
-        # Multiple files - add part numbers
         stem = output_path.stem
         suffix = output_path.suffix
         parent = output_path.parent
 
+        # Each chunk is handed to a writer thread as soon as it is complete,
+        # so rendering the next chunk overlaps with writing the previous ones
         generated_files: list[Path] = []
-        for i, chunk in enumerate(chunks, start=1):
-            part_path = parent / f"{stem}_part{i}{suffix}"
-            part_path.write_text(chunk, encoding="utf-8")
-            generated_files.append(part_path)
+        with ThreadPoolExecutor(max_workers=CHUNK_WRITE_WORKERS) as pool:
+            pending: deque[Future[None]] = deque()
+            for i, chunk in enumerate(self._iter_chunks(max_bytes), start=1):
+                part_path = parent / f"{stem}_part{i}{suffix}"
+                generated_files.append(part_path)
+                pending.append(pool.submit(_write_output, part_path, chunk))
+                # Bound the number of chunks held in memory
+                if len(pending) > CHUNK_WRITE_WORKERS:
+                    pending.popleft().result()
+
+            for future in pending:
+                future.result()
+
+        if len(generated_files) == 1:
+            # Single file - use original name
+            generated_files[0].replace(output_path)
+            return [output_path]
 
         return generated_files
 
@@ -5,27 +5,65 @@ This module is optional and requires the 'pdf' extra to be installed.
 Provides functionality to extract text content from PDF files.
 """
 
+import contextlib
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+from modules.content_cache import ContentCache
+from modules.text_reader import Placeholder
+
 # Lazy import for optional dependency
 if TYPE_CHECKING:
     from docling.document_converter import DocumentConverter
 
 
+# Default cap on read_many() worker processes. Each worker loads its own
+# copy of Docling's models (several GB), and torch already runs each
+# conversion on multiple threads, so more workers mostly add memory use.
+DEFAULT_PDF_WORKERS = 2
+
+# Process-local reader used by read_many() workers
+_worker_reader: "PDFReader | None" = None
+
+
 class PDFReaderError(Exception):
     """Exception raised when PDF reading fails."""
 
     pass
 
 
+def _init_worker() -> None:
+    """Create a warmed-up PDF reader in a read_many() worker process."""
+    global _worker_reader
+    # The parent process owns the cache, so workers only extract
+    _worker_reader = PDFReader()
+    # Failures are reported per file by read_pdf_safe()
+    with contextlib.suppress(Exception):
+        _worker_reader._get_converter()
+
+
+def _read_in_worker(file_path: Path) -> str:
+    """Extract a PDF with the worker process's reader."""
+    assert _worker_reader is not None
+    return _worker_reader.read_pdf_safe(file_path)
+
+
 class PDFReader:
     """Reads PDF files using Docling for text extraction."""
 
-    def __init__(self):
-        """Initialize the PDF reader."""
+    def __init__(self, cache_dir: Path | None = None):
+        """
+        Initialize the PDF reader.
+
+        Args:
+            cache_dir: Optional directory to cache extracted text in, so
+                unchanged PDFs are not converted again on later runs.
+        """
         self._converter: "DocumentConverter | None" = None
         self._available: bool | None = None
+        self._cache = ContentCache(cache_dir) if cache_dir else None
 
     @property
     def is_available(self) -> bool:
@@ -50,12 +88,14 @@ class PDFReader:
 
         return self._converter
 
-    def read_pdf(self, file_path: Path) -> str | None:
+    def read_pdf(self, file_path: Path, key: str | None = None) -> str | None:
         """
         Extract text content from a PDF file.
 
         Args:
             file_path: Path to the PDF file.
+            key: Stable name of the file for the cache, such as its path
+                within the repository (defaults to file_path).
 
         Returns:
             Extracted text content, or None if extraction failed.
@@ -72,6 +112,12 @@ class PDFReader:
         if file_path.suffix.lower() != ".pdf":
             return None
 
+        if self._cache is not None:
+            return self._cache.get_or_compute(file_path, self._extract, key)
+        return self._extract(file_path)
+
+    def _extract(self, file_path: Path) -> str:
+        """Run Docling on a PDF file and export the result as Markdown."""
         try:
             converter = self._get_converter()
             result = converter.convert(str(file_path))
@@ -87,7 +133,7 @@ class PDFReader:
         except Exception as e:
             raise PDFReaderError(f"Failed to extract PDF content: {e}") from e
 
-    def read_pdf_safe(self, file_path: Path) -> str:
+    def read_pdf_safe(self, file_path: Path, key: str | None = None) -> str:
         """
         Safely extract text content from a PDF file.
 
@@ -96,16 +142,115 @@ class PDFReader:
 
         Args:
             file_path: Path to the PDF file.
+            key: Stable name of the file for the cache (see read_pdf()).
 
         Returns:
-            Extracted text content or an error message.
+            Extracted text content, or a Placeholder with an error message.
         """
         try:
-            content = self.read_pdf(file_path)
+            content = self.read_pdf(file_path, key)
             if content is None:
-                return "[Failed to read PDF file]"
+                return Placeholder("[Failed to read PDF file]")
             return content
         except PDFReaderError as e:
-            return f"[PDF extraction error: {e}]"
+            return Placeholder(f"[PDF extraction error: {e}]")
         except Exception as e:
-            return f"[Unexpected error reading PDF: {e}]"
+            return Placeholder(f"[Unexpected error reading PDF: {e}]")
+
+    def read_many(
+        self,
+        file_paths: list[Path],
+        keys: list[str] | None = None,
+        max_workers: int | None = None,
+    ) -> Iterator[str]:
+        """
+        Extract several PDF files in parallel worker processes.
+
+        All files are submitted right away, so extraction runs in the
+        background while the caller does other work. Each worker builds its
+        own DocumentConverter once and reuses it for every file it handles.
+        Cache lookups and stores happen in this process, so only cache
+        misses reach the workers.
+
+        Args:
+            file_paths: Paths to the PDF files.
+            keys: Stable names of the files for the cache (see read_pdf()).
+            max_workers: Number of worker processes (defaults to
+                DEFAULT_PDF_WORKERS, capped by the number of files).
+
+        Returns:
+            Iterator over the extracted text or error messages, in the order
+            of file_paths, as read_pdf_safe() would return them.
+        """
+        names: list[str | None] = list(keys) if keys else [None] * len(file_paths)
+
+        # Spawning workers and loading Docling's models in each of them
+        # only pays off with several files
+        if len(file_paths) <= 1 or not self.is_available:
+            return map(self.read_pdf_safe, file_paths, names)
+
+        cache = self._cache
+        cached = [
+            cache.get(path, name) if cache else None
+            for path, name in zip(file_paths, names, strict=True)
+        ]
+        misses = [
+            path
+            for path, content in zip(file_paths, cached, strict=True)
+            if content is None
+        ]
+        if not misses:
+            return iter(cached)
+
+        executor = ProcessPoolExecutor(
+            max_workers=min(len(misses), max_workers or DEFAULT_PDF_WORKERS),
+            initializer=_init_worker,
+        )
+        try:
+            extracted = [executor.submit(_read_in_worker, path) for path in misses]
+        finally:
+            # Pending files still get processed; this only lets the workers
+            # exit once they are done
+            executor.shutdown(wait=False)
+        return self._merge_extracted(file_paths, names, cached, extracted)
+
+    def _merge_extracted(
+        self,
+        file_paths: list[Path],
+        names: list[str | None],
+        cached: list[str | None],
+        extracted: list[Future[str]],
+    ) -> Iterator[str]:
+        """
+        Fill cache misses in with the workers' results, caching them.
+
+        A worker dying (e.g. killed for running out of memory) breaks the
+        whole pool. The file that surfaced the failure gets an error message,
+        and the remaining misses are extracted in this process instead.
+        """
+        pending = iter(extracted)
+        broken = False
+        for path, name, content in zip(file_paths, names, cached, strict=True):
+            if content is not None:
+                yield content
+                continue
+
+            future = next(pending)
+            try:
+                content = future.result()
+            except Exception as e:
+                if broken:
+                    # read_pdf_safe() caches successful extractions itself
+                    yield self.read_pdf_safe(path, name)
+                    continue
+                broken = True
+                content = Placeholder(f"[PDF extraction error: {e}]")
+
+            if self._cache is not None and not isinstance(content, Placeholder):
+                self._cache.put(path, content, name)
+            yield content
+
+    def save_cache(self) -> None:
+        """Write the cache manifest, if caching is enabled (see ContentCache.save())."""
+        if self._cache is not None:
+            self._cache.save()